@@ -1,42 +1,90 @@
+import bisect
 import streamlit as st
 import pandas as pd
 import sqlite3
+import threading
 from datetime import datetime
 
 # ------------------------------------------------------------
 # DATABASE SETUP (auto-fix missing columns)
 # ------------------------------------------------------------
-conn = sqlite3.connect('reservations.db', check_same_thread=False)
-c = conn.cursor()
+DB_PATH = 'reservations.db'
+
+
+@st.cache_resource
+def get_conn():
+    # One connection per process; Streamlit reruns reuse it instead of reconnecting
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA cache_size=-64000;")  # ~64 MB page cache
+    return conn
 
-# Create base table if not exists
-c.execute('''
-    CREATE TABLE IF NOT EXISTS reservations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        date TEXT,
-        time TEXT,
-        guests INTEGER,
-        status TEXT
-    )
-''')
-conn.commit()
-
-# Check for missing columns and add if necessary
-existing_cols = [col[1] for col in c.execute("PRAGMA table_info(reservations);").fetchall()]
-if "contact" not in existing_cols:
-    try:
-        c.execute("ALTER TABLE reservations ADD COLUMN contact TEXT;")
-        conn.commit()
-    except Exception:
-        pass
-
-if "table_number" not in existing_cols:
-    try:
-        c.execute("ALTER TABLE reservations ADD COLUMN table_number TEXT;")
-        conn.commit()
-    except Exception:
-        pass
+
+@st.cache_resource
+def get_write_lock():
+    # Sessions share the connection, so their write transactions must not interleave
+    return threading.Lock()
+
+
+# Columns added after the original schema, created on databases that predate them
+ADDED_COLUMNS = {
+    "contact": "TEXT",
+    "table_number": "TEXT",
+}
+
+
+@st.cache_resource
+def ensure_schema():
+    # Runs once per process; later reruns skip the PRAGMA / ALTER checks
+    conn = get_conn()
+    c = conn.cursor()
+
+    # Create base table if not exists
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            date TEXT,
+            time TEXT,
+            guests INTEGER,
+            status TEXT
+        )
+    ''')
+    conn.commit()
+
+    # Check for missing columns and add if necessary
+    existing_cols = {col[1] for col in c.execute("PRAGMA table_info(reservations);").fetchall()}
+    for col, col_type in ADDED_COLUMNS.items():
+        if col not in existing_cols:
+            try:
+                c.execute(f"ALTER TABLE reservations ADD COLUMN {col} {col_type};")
+            except Exception:
+                pass
+    conn.commit()
+
+    # Convert legacy 12-hour times ("07:30 PM") to the stored 24-hour format
+    c.execute("""
+        UPDATE reservations
+        SET time = printf('%02d:%s',
+                          CAST(substr(time, 1, 2) AS INTEGER) % 12
+                          + CASE upper(substr(time, 7, 2)) WHEN 'PM' THEN 12 ELSE 0 END,
+                          substr(time, 4, 2))
+        WHERE time LIKE '__:__ _M'
+    """)
+    conn.commit()
+
+    # Index the customer lookup (WHERE contact=?) so it is a seek, not a full scan
+    c.execute("CREATE INDEX IF NOT EXISTS idx_res_contact_date ON reservations(contact, date, time);")
+    conn.commit()
+    return True
+
+
+conn = get_conn()
+write_lock = get_write_lock()
+ensure_schema()
+c = conn.cursor()
 
 # ------------------------------------------------------------
 # TABLE CAPACITY MAPPING
@@ -50,6 +98,46 @@ TABLES = {
     "Table 6": 8
 }
 
+# Tables sorted by capacity, so the smallest fitting table is a bisect away
+_TABLES_SORTED = sorted(TABLES.items(), key=lambda kv: kv[1])
+_CAPS = [cap for _, cap in _TABLES_SORTED]
+
+# Times are stored as 24-hour HH:MM (sorts correctly as text) and shown as 12-hour
+TIME_FORMAT = "%H:%M"
+DISPLAY_TIME_FORMAT = "%I:%M %p"
+
+
+@st.cache_resource
+def display_times():
+    # Every HH:MM of the day mapped to its display string, built once per process
+    return {
+        f"{h:02d}:{m:02d}": datetime(2000, 1, 1, h, m).strftime(DISPLAY_TIME_FORMAT)
+        for h in range(24) for m in range(60)
+    }
+
+# ------------------------------------------------------------
+# SQL STATEMENTS (module-level so sqlite3's statement cache reuses them)
+# ------------------------------------------------------------
+INSERT_RES_SQL = """
+    INSERT INTO reservations (name, contact, date, time, guests, status, table_number)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_STATUS_SQL = "UPDATE reservations SET status=? WHERE id=?"
+
+# Only the columns the reservation grids display
+RES_COLUMNS = ['id', 'name', 'date', 'time', 'guests', 'status', 'table_number']
+SELECT_RES_SQL = f"SELECT {', '.join(RES_COLUMNS)} FROM reservations"
+SELECT_RES_BY_CONTACT_SQL = f"SELECT {', '.join(RES_COLUMNS)} FROM reservations WHERE contact=?"
+
+# ------------------------------------------------------------
+# CACHED QUERIES (cleared whenever reservations change)
+# ------------------------------------------------------------
+@st.cache_data(show_spinner=False)
+def fetch_all_reservations():
+    rows = conn.execute(SELECT_RES_SQL).fetchall()
+    return pd.DataFrame.from_records(rows, columns=RES_COLUMNS)
+
 # ------------------------------------------------------------
 # STREAMLIT UI
 # ------------------------------------------------------------
@@ -79,22 +167,17 @@ if role == "Customer":
             if name.strip() == "" or contact.strip() == "":
                 st.warning("⚠️ Please fill in both Name and Contact.")
             else:
-                # Auto-assign table based on group size
-                assigned_table = None
-                for table, capacity in TABLES.items():
-                    if guests <= capacity:
-                        assigned_table = table
-                        break
+                # Auto-assign the smallest table that fits the group
+                idx = bisect.bisect_left(_CAPS, guests)
+                assigned_table = _TABLES_SORTED[idx][0] if idx < len(_CAPS) else None
 
                 if assigned_table is None:
                     st.error("❌ No suitable table available for that group size.")
                 else:
-                    formatted_time = time.strftime("%I:%M %p")
-                    c.execute("""
-                        INSERT INTO reservations (name, contact, date, time, guests, status, table_number)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (name, contact, str(date), formatted_time, guests, "Confirmed", assigned_table))
-                    conn.commit()
+                    formatted_time = time.strftime(TIME_FORMAT)
+                    with write_lock, conn:
+                        c.execute(INSERT_RES_SQL, (name, contact, str(date), formatted_time, guests, "Confirmed", assigned_table))
+                    fetch_all_reservations.clear()
                     st.success(f"✅ Reservation Confirmed! Assigned to {assigned_table}")
 
     # View reservations tab
@@ -105,12 +188,14 @@ if role == "Customer":
             if search_contact.strip() == "":
                 st.warning("Please enter your contact information to search.")
             else:
-                df = pd.read_sql("SELECT * FROM reservations WHERE contact=?", conn, params=(search_contact,))
-                if df.empty:
+                # Plain cursor fetch; a DataFrame is only built when there is something to show
+                rows = conn.execute(SELECT_RES_BY_CONTACT_SQL, (search_contact,)).fetchall()
+                if not rows:
                     st.info("No reservations found for this contact.")
                 else:
-                    df['time'] = pd.to_datetime(df['time'], errors='coerce').dt.strftime("%I:%M %p")
-                    st.dataframe(df[['id', 'name', 'date', 'time', 'guests', 'status', 'table_number']])
+                    df = pd.DataFrame.from_records(rows, columns=RES_COLUMNS)
+                    df['time'] = df['time'].str.slice(0, 5).map(display_times())
+                    st.dataframe(df)
 
 # ------------------------------------------------------------
 # ADMIN INTERFACE
@@ -126,12 +211,12 @@ elif role == "Admin":
 
         # View all reservations
         with tab1:
-            df = pd.read_sql("SELECT * FROM reservations", conn)
+            df = fetch_all_reservations()
             if df.empty:
                 st.info("No reservations yet.")
             else:
-                df['time'] = pd.to_datetime(df['time'], errors='coerce').dt.strftime("%I:%M %p")
-                st.dataframe(df[['id', 'name', 'date', 'time', 'guests', 'status', 'table_number']])
+                df['time'] = df['time'].str.slice(0, 5).map(display_times())
+                st.dataframe(df)
 
         # Manage reservations
         with tab2:
@@ -140,11 +225,11 @@ elif role == "Admin":
             action = st.selectbox("Select Action:", ["Cancel Reservation", "Mark as Completed"])
 
             if st.button("Update Status"):
-                c.execute("SELECT * FROM reservations WHERE id=?", (res_id,))
-                if c.fetchone():
-                    new_status = "Cancelled" if action == "Cancel Reservation" else "Completed"
-                    c.execute("UPDATE reservations SET status=? WHERE id=?", (new_status, res_id))
-                    conn.commit()
+                new_status = "Cancelled" if action == "Cancel Reservation" else "Completed"
+                with write_lock, conn:
+                    c.execute(UPDATE_STATUS_SQL, (new_status, res_id))
+                if c.rowcount:
+                    fetch_all_reservations.clear()
                     st.success(f"✅ Reservation #{res_id} marked as {new_status}.")
                 else:
                     st.error("❌ Reservation ID not found.")